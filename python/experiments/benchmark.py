@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark harness.
+
+Register functions with the `@benchmark()` decorator, then call `main()` to get a CLI that runs them, reports their
+timings' statistics and peak memory, saves results as JSON baselines, and compares new results against them to flag
+regressions.
+
+Each benchmark is:
+1. warmed up, so caches, lazy imports and the like do not end up in the measurements;
+2. calibrated, so that each run lasts long enough for the timer's resolution not to matter;
+3. run 'repeat' times, each run calling the function 'number' times with the garbage collector disabled;
+4. called once more under `tracemalloc` to get its peak memory usage, as tracing slows down the timed runs.
+
+A result is a regression when its median is both slower than the baseline's by more than the threshold, and further
+away from it than twice the standard deviation of either result, so that noisy benchmarks are not flagged for noise.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from timeit import Timer
+
+benchmark_registry: dict[str, Callable[[], object]] = {}
+
+
+def benchmark(name: str | None = None):
+    def decorator(func):
+        benchmark_name: str = name or func.__name__
+        benchmark_registry[benchmark_name] = func
+        return func
+    return decorator
+
+
+@dataclass
+class Result:
+    name: str
+    number: int
+    times: list[float]  # seconds per call, one value per run
+    peak_memory: int  # bytes
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.times)
+
+    @property
+    def stddev(self) -> float:
+        return statistics.stdev(self.times) if len(self.times) > 1 else 0.0
+
+    def percentile(self, p: int) -> float:
+        if len(self.times) < 2:
+            return self.times[0]
+        return statistics.quantiles(self.times, n=100, method='inclusive')[p - 1]
+
+
+def measure(
+    func: Callable[[], object],
+    name: str | None = None,
+    warmup: int = 1,
+    repeat: int = 20,
+    number: int | None = None,
+    min_run_time: float = 0.05
+) -> Result:
+    timer = Timer(func)
+
+    if number is None:
+        # autorange() stops at 0.2s, which is more than needed with many repetitions
+        number = 1
+        while timer.timeit(number) < min_run_time:
+            number *= 2
+    for _ in range(warmup):
+        timer.timeit(number)
+
+    times = [t / number for t in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(name or func.__name__, number, times, peak_memory)
+
+
+def run(names: list[str] | None = None, **kwargs) -> dict[str, Result]:
+    results = {}
+    for name, func in benchmark_registry.items():
+        if names and name not in names:
+            continue
+        logging.debug('running %s', name)
+        results[name] = measure(func, name, **kwargs)
+    return results
+
+
+def _environment() -> dict[str, str]:
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'machine': platform.machine(), 'system': platform.system()}
+
+
+def save_baseline(results: dict[str, Result], path: Path) -> None:
+    path.write_text(json.dumps(
+        {'environment': _environment(), 'results': {n: asdict(r) for n, r in results.items()}},
+        indent=2
+    ))
+
+
+def load_baseline(path: Path) -> dict[str, Result]:
+    data = json.loads(path.read_text())
+    if data['environment'] != _environment():
+        logging.warning('baseline was taken in a different environment: %s', data['environment'])
+    return {n: Result(**r) for n, r in data['results'].items()}
+
+
+def is_regression(result: Result, baseline: Result, threshold: float) -> bool:
+    slowdown = result.median - baseline.median
+    return (
+        slowdown > baseline.median * threshold
+        and slowdown > 2 * max(result.stddev, baseline.stddev)
+    )
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3f}{unit}'
+    return f'{seconds / 1e-9:.1f}ns'
+
+
+def report(
+    results: dict[str, Result],
+    baseline: dict[str, Result] | None = None,
+    threshold: float = 0.1,
+    memory: bool = True
+) -> list[str]:
+    """
+    Print the results as a table and return the names of the regressed benchmarks.
+
+    Set 'memory' to False to leave out the peak memory when it does not mean anything, e.g. for benchmarks only
+    starting subprocesses.
+    """
+
+    regressions = []
+    width = max(map(len, results), default=0)
+    header = f'{"benchmark":<{width}}  {"median":>10}  {"p5":>10}  {"p95":>10}  {"stddev":>10}'
+    print(header + (f'  {"peak mem":>10}' if memory else '') + '  vs baseline')
+    for name, r in results.items():
+        line = (
+            f'{name:<{width}}  {_format_time(r.median):>10}  {_format_time(r.percentile(5)):>10}  '
+            f'{_format_time(r.percentile(95)):>10}  {_format_time(r.stddev):>10}'
+        )
+        if memory:
+            line += f'  {r.peak_memory:>9}B'
+        if baseline and name in baseline:
+            line += f'  {r.median / baseline[name].median - 1:+.1%}'
+            if is_regression(r, baseline[name], threshold):
+                line += ' REGRESSION'
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the registered benchmarks.')
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all of them by default')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per benchmark')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per benchmark')
+    parser.add_argument('--number', type=int, default=None, help='calls per run, calibrated by default')
+    parser.add_argument('--save', type=Path,
+                        help='save the results as a JSON baseline, merged into it when only some benchmarks run')
+    parser.add_argument('--compare', type=Path, help='compare the results against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown of the median over the baseline to consider a regression')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    if args.number is not None and args.number < 1:
+        parser.error('--number must be at least 1')
+    if args.warmup < 0:
+        parser.error('--warmup cannot be negative')
+    unknown = [n for n in args.names if n not in benchmark_registry]
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}; available: {", ".join(benchmark_registry)}')
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    results = run(args.names, warmup=args.warmup, repeat=args.repeat, number=args.number)
+    baseline = load_baseline(args.compare) if args.compare else None
+    regressions = report(results, baseline, args.threshold)
+    if args.save:
+        if args.names and args.save.exists():
+            # keep the baseline's other benchmarks when only some were run
+            results = load_baseline(args.save) | results
+        save_baseline(results, args.save)
+
+    if regressions:
+        logging.error('regressions: %s', ', '.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
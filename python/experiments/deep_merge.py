@@ -3,8 +3,6 @@
 import logging
 from collections.abc import MutableMapping, MutableSequence
 
-logging.basicConfig(level=logging.DEBUG)
-
 d1 = {
     'listen_address': '0.0.0.0:9090',
     'runners': [
@@ -42,9 +40,6 @@ d2 = {
     }]
 }
 
-logging.info(f'd1: {d1}')
-logging.info(f'd2: {d2}')
-
 def merge_dicts(
     *args: MutableMapping,
     recursive: bool=True,
@@ -57,17 +52,17 @@ def merge_dicts(
 
     # remove all empty dicts from the arguments so they are not processed later
     nonempty_args = tuple(a for a in args if a != {})
-    logging.debug(f'nonempty_args: {nonempty_args}')
+    logging.debug('nonempty_args: %s', nonempty_args)
 
-    if nonempty_args == []:
+    if not nonempty_args:
         result = {}
     else:
         # copy over the first element directly, as it will be the base for
         # merging; iterate on the rest
         result = nonempty_args[0].copy()
-        logging.debug(f'result: {result}')
+        logging.debug('result: %s', result)
         for arg in nonempty_args[1:]:
-            logging.debug(f'arg: {arg}')
+            logging.debug('arg: %s', arg)
             for k, v in arg.items():
                 if k not in result.keys():
                     # import the new key-value pair and go straight to the next
@@ -82,7 +77,12 @@ def merge_dicts(
                         # same key are dicts: recurse if requested, or just
                         # override the existing value otherwise
                         if recursive:
-                            result[k] = merge(result[k], v, recursive)
+                            result[k] = merge_dicts(
+                                result[k], v,
+                                recursive=recursive,
+                                list_merge_key=list_merge_key,
+                                list_merge_strategy=list_merge_strategy
+                            )
                         else:
                             result[k] = v
                         continue
@@ -119,9 +119,15 @@ def merge_dicts(
                         result[k] = v
     return result
 
-logging.info(f'final (replace): {merge_dicts(d1, d2)}')
-logging.info(f'final (append): {merge_dicts(d1, d2, list_merge_strategy="append")}')
-logging.info(f'final (append_rp): {merge_dicts(d1, d2, list_merge_strategy="append_rp")}')
-logging.info(f'final (prepend): {merge_dicts(d1, d2, list_merge_strategy="prepend")}')
-logging.info(f'final (prepend_rp): {merge_dicts(d1, d2, list_merge_strategy="prepend_rp")}')
-logging.info(f'final (keep): {merge_dicts(d1, d2, list_merge_strategy="keep")}')
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)
+
+    logging.info('d1: %s', d1)
+    logging.info('d2: %s', d2)
+
+    logging.info(f'final (replace): {merge_dicts(d1, d2)}')
+    logging.info(f'final (append): {merge_dicts(d1, d2, list_merge_strategy="append")}')
+    logging.info(f'final (append_rp): {merge_dicts(d1, d2, list_merge_strategy="append_rp")}')
+    logging.info(f'final (prepend): {merge_dicts(d1, d2, list_merge_strategy="prepend")}')
+    logging.info(f'final (prepend_rp): {merge_dicts(d1, d2, list_merge_strategy="prepend_rp")}')
+    logging.info(f'final (keep): {merge_dicts(d1, d2, list_merge_strategy="keep")}')
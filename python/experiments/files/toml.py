@@ -4,12 +4,15 @@
 
 from datetime import datetime, UTC
 from tomlkit import (
-    comment, dump, dumps, load, nl, table
+    comment, dump, dumps, nl, table
 )
 
+from toml_loader import load
+
 # Get the contents of a file.
-with open('input.toml', 'r') as i:
-    toml_doc = load(i)
+# Only the 'edit' mode keeps the formatting and allows writing the document back;
+# use the default 'fast' mode for files that are only read.
+toml_doc = load('input.toml', mode='edit')
 
 # Prove the content is saved in a tomlkit.toml_document.TOMLDocument object.
 print(type(toml_doc))
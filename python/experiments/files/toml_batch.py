@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+"""
+Apply the same set of edits to many TOML files at once, keeping their formatting.
+
+Edits are read from a TOML specification (see 'edits.toml') as an ordered '[[edits]]' array:
+- `comment = "text"` adds a top-level comment, unless the document already has it.
+- `key = "name"` or `key = ["table", "name"]` with `value = …` sets a key, creating intermediate tables as needed.
+  Inline tables become standard tables. `key_comment = "text"` adds a trailing comment to the key.
+
+Edits are idempotent: re-applying them to an already edited file produces the same content, and such files are not
+rewritten.
+The content hashes of up-to-date files are also recorded in a state file, so that later runs with the same
+specification skip them without even parsing them.
+
+Files are processed on a process pool and written atomically.
+
+Usage: `./toml_batch.py --edits edits.toml 'configs/**/*.toml'`
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import tomlkit
+from tomlkit.items import Table
+
+from toml_loader import content_hash, load
+
+# Set in each worker by _init_worker(), so they are not pickled once per file.
+_edits: list[dict[str, Any]] = []
+_up_to_date: frozenset[str] = frozenset()
+
+
+def _unwrap(item: Any) -> Any:
+    return item.unwrap() if hasattr(item, 'unwrap') else item
+
+
+def _as_item(value: Any):
+    if isinstance(value, dict):
+        # inline tables in the specification are meant as standard tables in the output
+        t = tomlkit.table()
+        for k, v in value.items():
+            t.add(k, _as_item(v))
+        return t
+    return tomlkit.item(value)
+
+
+def _has_comment(doc: tomlkit.TOMLDocument, text: str) -> bool:
+    # comments added after a table are parsed back as part of that table, so look at the whole document
+    wanted = tomlkit.comment(text).as_string().strip()
+    return any(line.strip() == wanted for line in doc.as_string().splitlines())
+
+
+def _set(container, key: str, value: Any) -> None:
+    if isinstance(value, dict) and isinstance(container.get(key), Table):
+        # merge into existing tables instead of replacing them, so keys added by other edits are kept
+        for k, v in value.items():
+            _set(container[key], k, v)
+    elif key not in container or _unwrap(container[key]) != value:
+        container[key] = _as_item(value)
+
+
+def apply_edits(doc: tomlkit.TOMLDocument, edits: list[dict[str, Any]]) -> None:
+    for edit in edits:
+        if 'comment' in edit:
+            if not _has_comment(doc, edit['comment']):
+                if doc.body:
+                    doc.add(tomlkit.nl())
+                doc.add(tomlkit.comment(edit['comment']))
+            continue
+
+        path = [edit['key']] if isinstance(edit['key'], str) else edit['key']
+        container = doc
+        for part in path[:-1]:
+            if part not in container:
+                container.add(part, tomlkit.table())
+            container = container[part]
+            if not isinstance(container, (Table, dict)):
+                raise ValueError(f"'{part}' in {path} is not a table")
+
+        key = path[-1]
+        _set(container, key, edit['value'])
+        if 'key_comment' in edit:
+            key_comment = tomlkit.comment(edit['key_comment']).as_string().strip()
+            if container[key].trivia.comment != key_comment:
+                container[key].comment(edit['key_comment'])
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    # the temporary file must be on the same filesystem for os.replace() to be atomic
+    with tempfile.NamedTemporaryFile('wb', dir=path.parent, prefix=f'.{path.name}.', delete=False) as f:
+        f.write(data)
+    try:
+        if path.exists():
+            shutil.copymode(path, f.name)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+def _init_worker(edits: list[dict[str, Any]], up_to_date: frozenset[str]) -> None:
+    global _edits, _up_to_date
+    _edits, _up_to_date = edits, up_to_date
+
+
+def process_file(path: Path, dry_run: bool = False) -> tuple[Path, str, str | None]:
+    """
+    Return the file's path, what was done with it and the hash of its final content.
+    """
+
+    try:
+        raw = path.read_bytes()
+        digest = content_hash(raw)
+        if digest in _up_to_date:
+            return path, 'skipped', digest
+
+        doc = tomlkit.parse(raw.decode())
+        apply_edits(doc, _edits)
+        edited = tomlkit.dumps(doc).encode()
+        if edited == raw:
+            return path, 'unchanged', digest
+
+        if dry_run:
+            return path, 'would write', None
+        write_atomically(path, edited)
+        return path, 'written', content_hash(edited)
+    except Exception as e:
+        logging.error('%s: %s', path, e)
+        return path, 'failed', None
+
+
+def _load_state(state_file: Path) -> dict[str, list[str]]:
+    try:
+        with open(state_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Apply the same edits to many TOML files.')
+    parser.add_argument('pattern', help="glob of the files to edit, '**' included")
+    parser.add_argument('--edits', required=True, type=Path, help='TOML file with the edits specification')
+    parser.add_argument('--state', default=Path('.toml_batch_state.json'), type=Path,
+                        help='file recording the hashes of already edited files')
+    parser.add_argument('--workers', type=int, default=None, help='processes to use, defaults to the CPUs count')
+    parser.add_argument('--dry-run', action='store_true', help='do not write anything')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    # a one-off specification gets nothing from a persistent cache
+    edits = load(args.edits, use_disk_cache=False)['edits']
+    # the same files can be up to date for a specification but not for another
+    spec_digest = content_hash(json.dumps(edits, sort_keys=True, default=str).encode())
+    state = _load_state(args.state)
+    up_to_date = frozenset(state.get(spec_digest, []))
+
+    files = [Path(p) for p in glob.iglob(args.pattern, recursive=True) if os.path.isfile(p)]
+    workers = args.workers or os.cpu_count() or 1
+    chunksize = max(1, len(files) // (workers * 4))
+    logging.info('processing %d files with %d workers', len(files), workers)
+
+    statuses = Counter()
+    hashes = set(up_to_date)
+    start = perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(edits, up_to_date)) as pool:
+        for path, status, digest in pool.map(process_file, files, [args.dry_run] * len(files), chunksize=chunksize):
+            logging.debug('%s: %s', path, status)
+            statuses[status] += 1
+            if digest is not None:
+                hashes.add(digest)
+    elapsed = perf_counter() - start
+
+    if not args.dry_run:
+        state[spec_digest] = sorted(hashes)
+        write_atomically(args.state, json.dumps(state, indent=2).encode())
+
+    logging.info(
+        '%s in %.2fs (%.1f files/s)',
+        ', '.join(f'{count} {status}' for status, count in sorted(statuses.items())) or 'nothing to do',
+        elapsed, len(files) / elapsed if elapsed else 0
+    )
+    return 1 if statuses['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+Two-mode TOML loading.
+
+- 'fast' uses the stdlib's `tomllib` and returns plain dicts.
+  Results are cached in memory and on disk, keyed by the file's path, mtime and content hash, so repeated loads of
+  unchanged files are close to free.
+  Treat the returned dicts as read-only, since they are shared between callers.
+- 'edit' uses `tomlkit` and returns a `TOMLDocument` that preserves comments and formatting.
+  Documents are mutable and meant to be written back, so they are never cached.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import tomllib
+from pathlib import Path
+from typing import Any, Literal
+
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'toml_loader'
+
+# resolved path -> (mtime_ns, size, sha256 digest, parsed data)
+_memory_cache: dict[Path, tuple[int, int, str, dict[str, Any]]] = {}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _disk_cache_file(path: Path) -> Path:
+    return CACHE_DIR / f'{hashlib.sha256(str(path).encode()).hexdigest()}.pickle'
+
+
+def _read_disk_cache(path: Path) -> tuple[int, int, str, dict[str, Any]] | None:
+    try:
+        with open(_disk_cache_file(path), 'rb') as f:
+            entry = pickle.load(f)
+    except Exception as e:
+        # unpickling corrupt or foreign files can fail in many ways, and parsing again is always an option
+        logging.debug('no usable disk cache for %s: %s', path, e)
+        return None
+    if not (isinstance(entry, tuple) and len(entry) == 4):
+        logging.debug('no usable disk cache for %s: unexpected content', path)
+        return None
+    return entry
+
+
+def _write_disk_cache(path: Path, entry: tuple[int, int, str, dict[str, Any]]) -> None:
+    # write to a temporary file first so concurrent readers never see partial caches
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=CACHE_DIR, delete=False) as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            os.replace(f.name, _disk_cache_file(path))
+        except BaseException:
+            os.unlink(f.name)
+            raise
+    except OSError as e:
+        logging.warning('could not write disk cache for %s: %s', path, e)
+
+
+def _load_fast(path: Path, use_disk_cache: bool) -> dict[str, Any]:
+    stat = path.stat()
+
+    # unchanged mtime and size: trust the cached entry without reading the file
+    entry = _memory_cache.get(path)
+    if entry is None and use_disk_cache:
+        entry = _read_disk_cache(path)
+    if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+        _memory_cache[path] = entry
+        return entry[3]
+
+    # the file was touched: its content might still be the same, and hashing is way cheaper than parsing
+    raw = path.read_bytes()
+    digest = content_hash(raw)
+    if entry is not None and entry[2] == digest:
+        logging.debug('%s was touched but its content did not change', path)
+        data = entry[3]
+    else:
+        logging.debug('parsing %s', path)
+        data = tomllib.loads(raw.decode())
+
+    entry = (stat.st_mtime_ns, stat.st_size, digest, data)
+    _memory_cache[path] = entry
+    if use_disk_cache:
+        _write_disk_cache(path, entry)
+    return data
+
+
+def _load_edit(path: Path):
+    # imported here so read-only users do not pay for it
+    import tomlkit
+
+    with open(path, 'r') as f:
+        return tomlkit.load(f)
+
+
+def load(path: str | os.PathLike, mode: Literal['fast', 'edit'] = 'fast', use_disk_cache: bool = True):
+    """
+    Load the TOML file at 'path'.
+
+    'fast' returns a cached, read-only dict; 'edit' returns a fresh, style-preserving tomlkit document.
+    """
+
+    path = Path(path).resolve()
+    if mode == 'fast':
+        return _load_fast(path, use_disk_cache)
+    if mode == 'edit':
+        return _load_edit(path)
+    raise ValueError(f"unknown mode '{mode}', expected 'fast' or 'edit'")
+
+
+def clear_cache(disk: bool = False) -> None:
+    _memory_cache.clear()
+    if disk:
+        for cache_file in CACHE_DIR.glob('*.pickle'):
+            cache_file.unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    from timeit import timeit
+
+    logging.basicConfig(level=logging.INFO)
+    input_file = Path(__file__).with_name('input.toml')
+
+    logging.info('fast: %s', load(input_file))
+    logging.info('edit: %s', type(load(input_file, mode='edit')))
+
+    clear_cache(disk=True)
+    logging.info('fast, cold: %.6fs', timeit(lambda: load(input_file), number=1))
+    logging.info('fast, warm: %.6fs', timeit(lambda: load(input_file), number=1))
+    clear_cache()
+    logging.info('fast, disk cache only: %.6fs', timeit(lambda: load(input_file), number=1))
+    logging.info('edit: %.6fs', timeit(lambda: load(input_file, mode='edit'), number=1))
@@ -1,19 +1,35 @@
-#!python3
+#!/usr/bin/env python3
 
-from timeit import timeit
+"""
+Usage:
+- `./performance_measuring.py --save baseline.json` to take a baseline;
+- `./performance_measuring.py --compare baseline.json` to check for regressions against it.
+"""
+
+import sys
+from functools import partial
+
+from benchmark import benchmark, main
+from deep_merge import d1, d2, merge_dicts
 
 do = lambda i: i+1
 
-def _for():
+@benchmark()
+def plain_for_loop():
     for i in range(1000):
         do(i)
 
-def _list():
+@benchmark()
+def list_comprehension():
     [ do(i) for i in range(1000) ]
 
-def _map():
-    map(do, range(1000))
+@benchmark()
+def consumed_map():
+    # map() is lazy and does nothing until its iterator is consumed
+    list(map(do, range(1000)))
+
+for strategy in ('replace', 'append', 'append_rp', 'prepend', 'prepend_rp', 'keep'):
+    benchmark(f'merge_dicts_{strategy}')(partial(merge_dicts, d1, d2, list_merge_strategy=strategy))
 
-print(f"plain for loop: {timeit(_for, number=100_000)}")
-print(f"list constructor: {timeit(_for, number=100_000)}")
-print(f"map: {timeit(_for, number=100_000)}")
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 
-import plugins  # triggers dynamic load of all plugins in the directory
-from plugin_manager import get_plugins
+import plugins  # indexes the plugins in the directory without importing them
+from plugin_manager import get_plugins, run_plugins
 
 print('Available plugins:')
 for name, plugin_func in get_plugins().items():
     print(f'- {name}')
-    plugin_func()
+    plugin_func()  # imports the plugin's module on first call
 
 plugins.plugin_1.hello_plugin_1()
+
+print('Running all plugins concurrently:')
+results = run_plugins(timeout=10)
+for result in sorted(results.values(), key=lambda r: r.wall_time, reverse=True):
+    outcome = f'failed: {result.exception!r}' if result.exception else 'ok'
+    print(f'- {result.name}: {result.wall_time * 1000:.3f}ms, {outcome}')
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""
+Compare the startup time of loading all plugins eagerly against using the cached index and lazy handles.
+
+Generates copies of this project with many plugins in a temporary directory, then times fresh interpreters that import
+the plugins package and call a single plugin.
+The eager copy uses the original `plugins/__init__.py`, which imports every module in the directory.
+
+Peak memory is not reported, since it would only be the one of this process and not of the timed interpreters.
+
+Usage: `./benchmark_startup.py [--plugins 500]`
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from benchmark import Result, measure, report
+
+project_dir = Path(__file__).resolve().parent
+
+plugin_template = '''\
+from plugin_manager import plugin
+
+@plugin()
+def hello_plugin_{i}():
+    print('Hello from Plugin {i}')
+'''
+
+# the plugins package's initialization before the index was introduced
+eager_init = '''\
+import os
+import importlib
+
+current_dir = os.path.dirname(__file__)
+for filename in os.listdir(current_dir):
+    if filename.endswith('.py') and filename != '__init__.py':
+        module_name = filename[:-3]
+        importlib.import_module(f'{__name__}.{module_name}')
+'''
+
+call_one = 'import plugins; from plugin_manager import get_plugins; get_plugins()["hello_plugin_0"]()'
+
+# name -> (project copy, code)
+scenarios = {
+    'eager': ('eager', call_one),
+    'lazy, cold index': ('lazy', f'{call_one}; import os; os.remove(plugins.index_file)'),
+    'lazy, cached index': ('lazy', call_one),
+}
+
+def generate_project(target: Path, count: int, init: str|None = None) -> None:
+    target.mkdir()
+    shutil.copy(project_dir / 'plugin_manager.py', target)
+    (target / 'plugins').mkdir()
+    if init is None:
+        shutil.copy(project_dir / 'plugins' / '__init__.py', target / 'plugins')
+    else:
+        (target / 'plugins' / '__init__.py').write_text(init)
+    for i in range(count):
+        (target / 'plugins' / f'plugin_{i}.py').write_text(plugin_template.format(i=i))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--plugins', type=int, default=500, help='plugins to generate')
+    parser.add_argument('--repeat', type=int, default=10, help='interpreters to start per scenario')
+    args = parser.parse_args()
+
+    results: dict[str, Result] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_project(Path(tmp) / 'eager', args.plugins, eager_init)
+        generate_project(Path(tmp) / 'lazy', args.plugins)
+        for name, (project, code) in scenarios.items():
+            command = [sys.executable, '-c', code]
+            results[name] = measure(
+                lambda: subprocess.run(command, cwd=Path(tmp) / project, check=True, stdout=subprocess.DEVNULL),
+                name, repeat=args.repeat, number=1
+            )
+
+    print(f'{args.plugins} plugins, one called; times include the interpreter startup')
+    report(results, memory=False)
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,221 @@
 #!/usr/bin/env python3
 
+import importlib
+import multiprocessing
+import os
+import pickle
+from collections import deque
+from dataclasses import dataclass
+from queue import Empty, SimpleQueue
+from threading import Thread
+from time import perf_counter
+from typing import Any, Literal
+
+# Filled by the decorator when plugin modules are imported.
 plugin_registry = {}
+# Maps plugin names to how they should be run; filled from the index, and by the decorator.
+plugin_options = {}
+# Maps plugin names to the modules defining them; filled without importing anything.
+plugin_index = {}
+
+def plugin(
+    name: str|None = None,
+    executor: Literal['thread', 'process'] = 'thread',
+    timeout: float|None = None
+):
+    """
+    Register the decorated function as a plugin.
+
+    'executor' is how `run_plugins()` runs it: threads suit I/O-bound plugins, processes CPU-bound ones.
+    'timeout' is the maximum amount of seconds `run_plugins()` waits for its result once it started running.
+    Use literals for both so that the plugins' index can record them.
+    """
+
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"unknown executor '{executor}', expected 'thread' or 'process'")
 
-def plugin(name: str|None = None):
     def decorator(func):
         plugin_name: str = name or func.__name__
         plugin_registry[plugin_name] = func
+        plugin_options[plugin_name] = {'executor': executor, 'timeout': timeout}
         return func
     return decorator
 
+class LazyPlugin:
+    """
+    Stands in for a plugin function, and imports its module only when first needed.
+    """
+
+    def __init__(self, name: str, module: str):
+        self.name = name
+        self.module = module
+
+    def load(self):
+        if self.name not in plugin_registry:
+            importlib.import_module(self.module)
+        if self.name not in plugin_registry:
+            raise LookupError(f"module '{self.module}' did not register the expected plugin '{self.name}'")
+        return plugin_registry[self.name]
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<LazyPlugin {self.name} from {self.module}>'
+
 def get_plugins():
-    return plugin_registry
+    plugins = {name: LazyPlugin(name, module) for name, module in plugin_index.items()}
+    # plugins imported directly and not in the index are returned as they are
+    for name, func in plugin_registry.items():
+        plugins.setdefault(name, func)
+    return plugins
+
+@dataclass
+class PluginResult:
+    name: str
+    result: Any = None
+    exception: BaseException|None = None
+    # Seconds from the plugin starting in its own thread or process to its outcome, measured by the caller for every
+    # outcome. Includes importing the plugin's module, and starting the process for 'process' plugins.
+    # Timed out plugins get the time they were waited for.
+    wall_time: float = 0.0
+
+def _call(module: str, name: str, args: tuple, kwargs: dict) -> Any:
+    # workers get names instead of functions, and import the plugin's module themselves
+    return LazyPlugin(name, module).load()(*args, **kwargs)
+
+def _process_main(sender, module: str, name: str, args: tuple, kwargs: dict) -> None:
+    try:
+        outcome = (_call(module, name, args, kwargs), None)
+    except BaseException as e:
+        outcome = (None, e)
+    try:
+        sender.send(outcome)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        sender.send((None, RuntimeError(f"could not send back the outcome of plugin '{name}': {e!r}")))
+    sender.close()
+
+def _start_thread(module: str, name: str, args: tuple, kwargs: dict, done: SimpleQueue):
+    """
+    Run the plugin on a daemon thread, so that hung plugins do not keep the interpreter from exiting.
+    Return a function stopping it, which does nothing since threads cannot be stopped.
+    """
+
+    def target():
+        try:
+            outcome = (_call(module, name, args, kwargs), None)
+        except BaseException as e:
+            outcome = (None, e)
+        done.put((name, *outcome, perf_counter()))
+
+    Thread(target=target, name=f'plugin-{name}', daemon=True).start()
+    return lambda: None
+
+def _start_process(module: str, name: str, args: tuple, kwargs: dict, done: SimpleQueue):
+    """
+    Run the plugin in a daemon process of its own, watched by a daemon thread reporting its outcome.
+    Return a function stopping it.
+    """
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_process_main, args=(sender, module, name, args, kwargs), name=f'plugin-{name}', daemon=True
+    )
+    process.start()
+    sender.close()
+
+    def watch():
+        try:
+            outcome = receiver.recv()
+        except EOFError:
+            process.join()
+            outcome = (None, RuntimeError(f"plugin '{name}' exited with code {process.exitcode} without a result"))
+        receiver.close()
+        done.put((name, *outcome, perf_counter()))
+        process.join()
+
+    Thread(target=watch, name=f'plugin-{name}-watcher', daemon=True).start()
+    return process.terminate
+
+def run_plugins(
+    names: list[str]|None = None,
+    args: tuple = (),
+    kwargs: dict|None = None,
+    timeout: float|None = None,
+    max_workers: int|None = None
+) -> dict[str, PluginResult]:
+    """
+    Run the given plugins, or all of them, concurrently in the way each one asked for.
+
+    'thread' plugins run on a daemon thread each, 'process' plugins in a daemon process each.
+    At most 'max_workers' plugins of each kind run at the same time; the others wait for a free slot.
+    It defaults to the CPUs count for processes, and to that plus 4 (up to 32) for threads like `ThreadPoolExecutor`.
+
+    Each plugin's own timeout takes precedence over 'timeout', and counts from when the plugin starts running.
+    Plugins timing out get a `TimeoutError` as exception, and free their slot right away.
+    Timed out 'process' plugins are terminated. 'thread' plugins cannot be stopped: timed out ones keep running in the
+    background until they finish or the interpreter exits, which kills them abruptly.
+
+    Plugins' modules are imported by the threads or processes running them, unless the index could not record the
+    plugins' options.
+    """
+
+    available = get_plugins()
+    names = list(available) if names is None else list(dict.fromkeys(names))
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise LookupError(f"unknown plugins: {', '.join(unknown)}")
+    kwargs = kwargs or {}
+
+    cpus = os.cpu_count() or 1
+    limits = {
+        'thread': max_workers or min(32, cpus + 4),
+        'process': max_workers or cpus,
+    }
+    starters = {'thread': _start_thread, 'process': _start_process}
+
+    pending = {'thread': deque(), 'process': deque()}
+    for name in names:
+        func = available[name]
+        module = func.module if isinstance(func, LazyPlugin) else func.__module__
+        if name not in plugin_options:
+            # the index could not record the options, and the module has to tell them
+            func.load()
+        options = plugin_options.get(name, {'executor': 'thread', 'timeout': None})
+        plugin_timeout = options['timeout'] if options['timeout'] is not None else timeout
+        pending[options['executor']].append((name, module, plugin_timeout))
+
+    done = SimpleQueue()
+    running = {}  # name -> (executor, start, deadline, stop)
+    results = {}
+    while any(pending.values()) or running:
+        for executor, queue in pending.items():
+            while queue and sum(r[0] == executor for r in running.values()) < limits[executor]:
+                name, module, plugin_timeout = queue.popleft()
+                start = perf_counter()
+                stop = starters[executor](module, name, args, kwargs, done)
+                deadline = None if plugin_timeout is None else start + plugin_timeout
+                running[name] = (executor, start, deadline, stop)
+
+        deadlines = [r[2] for r in running.values() if r[2] is not None]
+        wait = max(0, min(deadlines) - perf_counter()) if deadlines else None
+        try:
+            name, result, exception, end = done.get(timeout=wait)
+            # outcomes of plugins that already timed out are dropped
+            if name in running:
+                _, start, _, _ = running.pop(name)
+                results[name] = PluginResult(name, result, exception, end - start)
+        except Empty:
+            pass
+
+        now = perf_counter()
+        for name, (_, start, deadline, stop) in list(running.items()):
+            if deadline is not None and deadline <= now:
+                stop()
+                del running[name]
+                results[name] = PluginResult(
+                    name, exception=TimeoutError(f"plugin '{name}' timed out after {deadline - start}s"),
+                    wall_time=now - start
+                )
+
+    return {name: results[name] for name in names}
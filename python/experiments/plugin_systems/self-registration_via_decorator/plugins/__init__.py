@@ -1,10 +1,129 @@
 #!/usr/bin/env python3
 
-import os
+import ast
 import importlib
+import json
+import os
+import warnings
+
+from plugin_manager import plugin_index, plugin_options
 
 current_dir = os.path.dirname(__file__)
-for filename in os.listdir(current_dir):
-    if filename.endswith('.py') and filename != '__init__.py':
-        module_name = filename[:-3]
-        importlib.import_module(f'{__name__}.{module_name}')
+index_file = os.path.join(current_dir, '__pycache__', 'plugin_index.json')
+
+# Bumped whenever the cached entries change shape, so that older caches are rebuilt.
+index_version = 3
+
+def _scan(path: str) -> dict:
+    """
+    Find the functions registered with `@plugin` in the file, without importing it.
+
+    Return their names as 'plugins', and as 'unindexable' the functions registered with a name that is only known
+    when the module runs.
+    'options' holds the decorator's 'executor' and 'timeout' for the plugins setting them as literals, so that
+    `run_plugins()` knows how to run them without importing their module.
+    """
+
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read(), path)
+    names = []
+    unindexable = []
+    options = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call):
+                continue
+            func = decorator.func
+            if (func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)) != 'plugin':
+                continue
+            name = node.name
+            for arg in decorator.args[:1] + [k.value for k in decorator.keywords if k.arg == 'name']:
+                if not isinstance(arg, ast.Constant):
+                    unindexable.append(f"{path}:{node.lineno}: '{node.name}'")
+                    break
+                if arg.value is not None:
+                    name = arg.value
+            else:
+                names.append(name)
+                keywords = {k.arg: k.value for k in decorator.keywords if k.arg in ('executor', 'timeout')}
+                if all(isinstance(v, ast.Constant) for v in keywords.values()):
+                    options[name] = {
+                        'executor': keywords['executor'].value if 'executor' in keywords else 'thread',
+                        'timeout': keywords['timeout'].value if 'timeout' in keywords else None,
+                    }
+    return {'plugins': names, 'unindexable': unindexable, 'options': options}
+
+def build_index() -> tuple[dict[str, str], dict[str, dict]]:
+    """
+    Map plugin names to their modules, and to their options when those are literals.
+    Files are only parsed again when their mtime changed since the index was last cached.
+    """
+
+    try:
+        with open(index_file, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    if cached.get('version') != index_version:
+        cached = {'version': index_version, 'files': {}}
+
+    entries = {}
+    for filename in os.listdir(current_dir):
+        if filename.endswith('.py') and filename != '__init__.py':
+            mtime_ns = os.stat(os.path.join(current_dir, filename)).st_mtime_ns
+            entry = cached['files'].get(filename)
+            if entry is None or entry['mtime_ns'] != mtime_ns:
+                entry = {'mtime_ns': mtime_ns, **_scan(os.path.join(current_dir, filename))}
+            entries[filename] = entry
+
+    if entries != cached['files']:
+        try:
+            os.makedirs(os.path.dirname(index_file), exist_ok=True)
+            with open(index_file, 'w') as f:
+                json.dump({'version': index_version, 'files': entries}, f)
+        except OSError:
+            pass  # the index will just be built again next time
+
+    # warn on every run, not only when files are parsed
+    for entry in entries.values():
+        for function in entry['unindexable']:
+            warnings.warn(
+                f"{function} is registered with a non-literal name and cannot be indexed; "
+                "import its module or use plugins.load_all() to make it available"
+            )
+
+    modules = {
+        plugin_name: f'{__name__}.{filename[:-3]}'
+        for filename, entry in entries.items()
+        for plugin_name in entry['plugins']
+    }
+    options = {
+        plugin_name: plugin_opts
+        for entry in entries.values()
+        for plugin_name, plugin_opts in entry['options'].items()
+    }
+    return modules, options
+
+def load_all():
+    """
+    Import every plugin module right away.
+    """
+
+    # not limited to the index, so plugins it could not find are loaded too
+    for filename in os.listdir(current_dir):
+        if filename.endswith('.py') and filename != '__init__.py':
+            importlib.import_module(f'{__name__}.{filename[:-3]}')
+
+def __getattr__(name: str):
+    # keep 'plugins.plugin_X' working even if the module was not imported yet
+    if os.path.isfile(os.path.join(current_dir, f'{name}.py')):
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+_modules, _options = build_index()
+plugin_index.update(_modules)
+for _name, _opts in _options.items():
+    # modules imported already registered their options through the decorator
+    plugin_options.setdefault(_name, _opts)
@@ -2,6 +2,6 @@
 
 from plugin_manager import plugin
 
-@plugin()
+@plugin(executor='process', timeout=5)
 def hello_plugin_2():
     print('Hello from Plugin 2')